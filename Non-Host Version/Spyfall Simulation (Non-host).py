@@ -70,42 +70,72 @@ LOCATION_ROLES = {
     "Courthouse": ["Judge", "Lawyer", "Defendant", "Juror", "Bailiff", "Clerk"],
 }
 
-ALL_LOCATIONS_SORTED = sorted(LOCATION_ROLES.keys())
+# Freeze each pool as a tuple of unique, interned role names (order preserved)
+LOCATION_ROLES = {
+    loc: tuple(dict.fromkeys(map(sys.intern, roles)))
+    for loc, roles in LOCATION_ROLES.items()
+}
+
+ALL_LOCATIONS_SORTED = tuple(sorted(LOCATION_ROLES.keys()))
+# Parallel views of LOCATION_ROLES: _POOLS[i] is the role pool for _LOCS[i]
+_LOCS, _POOLS = map(tuple, zip(*LOCATION_ROLES.items()))
+_RNG = secrets.SystemRandom()
+
+SPY_REVEAL_TEXT = "YOU ARE THE SPY 🕵️\n\nFind the location!"
+
+def _enable_ansi():
+    """Turn on VT escape handling for the Windows console; True if usable."""
+    if os.name != "nt":
+        return True
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except Exception:
+        return False
 
-def clear_screen():
-    os.system("cls" if os.name == "nt" else "clear")
 
+_ANSI_OK = _enable_ansi()
 
-def _assign_non_spy_roles(location: str, non_spy_count: int):
-    pool = list(LOCATION_ROLES[location])
-    rng = secrets.SystemRandom()
 
+def clear_screen():
+    if _ANSI_OK:
+        # 3J also wipes scrollback so the next player can't scroll up to the last reveal
+        sys.stdout.write("\x1b[H\x1b[2J\x1b[3J")
+        sys.stdout.flush()
+    else:
+        os.system("cls")  # legacy Windows console without VT support
+
+
+def _assign_non_spy_roles(pool: tuple, non_spy_count: int):
     if non_spy_count <= len(pool):
-        return rng.sample(pool, non_spy_count)  # unique roles
+        return _RNG.sample(pool, non_spy_count)  # unique roles
     # Need more roles than pool size -> allow duplicates
-    roles = pool[:]
-    while len(roles) < non_spy_count:
-        roles.append(rng.choice(pool))
-    rng.shuffle(roles)
+    roles = [*pool, *_RNG.choices(pool, k=non_spy_count - len(pool))]
+    _RNG.shuffle(roles)
     return roles
 
 
 def deal_roles(player_names):
-    rng = secrets.SystemRandom()
-    location = rng.choice(list(LOCATION_ROLES.keys()))
-    spy_idx = rng.randrange(len(player_names))
+    i = _RNG.randrange(len(_LOCS))
+    location = _LOCS[i]
+    spy_idx = _RNG.randrange(len(player_names))
 
     non_spy_needed = len(player_names) - 1
-    non_spy_roles = _assign_non_spy_roles(location, non_spy_needed)
-    role_iter = iter(non_spy_roles)
-
-    roles = []
-    for i, name in enumerate(player_names):
-        if i == spy_idx:
-            roles.append((name, "SPY", None, None))
-        else:
-            r = next(role_iter)
-            roles.append((name, "PLAYER", location, r))
+    non_spy_roles = _assign_non_spy_roles(_POOLS[i], non_spy_needed)
+
+    # Each entry is (name, kind, role, reveal_text); the GUI text is formatted once per deal
+    non_spy_names = player_names[:spy_idx] + player_names[spy_idx + 1:]
+    roles = [
+        (name, "PLAYER", r, f"LOCATION:\n{location}\n\nROLE:\n{r}")
+        for name, r in zip(non_spy_names, non_spy_roles)
+    ]
+    roles.insert(spy_idx, (player_names[spy_idx], "SPY", None, SPY_REVEAL_TEXT))
     return location, spy_idx, roles
 
 
@@ -117,6 +147,34 @@ def run_gui():
     except Exception:
         return False
 
+    def ask_player_names(parent, n):
+        """Ask for all player names in one dialog; blanks become 'Player i'."""
+        dialog = tk.Toplevel(parent)
+        dialog.title("Player Names")
+        dialog.transient(parent)
+
+        entries = []
+        for i in range(n):
+            tk.Label(dialog, text=f"Player {i+1}").grid(row=i, column=0, padx=10, pady=2, sticky="e")
+            entry = tk.Entry(dialog, width=24)
+            entry.grid(row=i, column=1, padx=10, pady=2)
+            entries.append(entry)
+
+        names = [f"Player {i+1}" for i in range(n)]
+
+        def on_ok(_event=None):
+            names[:] = [e.get().strip() or f"Player {i+1}" for i, e in enumerate(entries)]
+            dialog.destroy()
+
+        tk.Button(dialog, text="OK", width=10, command=on_ok).grid(row=n, column=0, columnspan=2, pady=10)
+        dialog.bind("<Return>", on_ok)
+
+        entries[0].focus_set()
+        dialog.wait_visibility()  # X11 refuses to grab a window that isn't mapped yet
+        dialog.grab_set()
+        parent.wait_window(dialog)
+        return names
+
     class SpyfallApp:
         def __init__(self, root):
             self.root = root
@@ -132,11 +190,7 @@ def run_gui():
 
             use_names = messagebox.askyesno("Spyfall", "Enter player names?")
             if use_names:
-                names = []
-                for i in range(n):
-                    nm = simpledialog.askstring("Player Name", f"Player {i+1} name:")
-                    names.append((nm or f"Player {i+1}").strip())
-                self.player_names = names
+                self.player_names = ask_player_names(root, n)
             else:
                 self.player_names = [f"Player {i+1}" for i in range(n)]
 
@@ -148,17 +202,23 @@ def run_gui():
             
             self.locations_overlay = None
 
-            self.title_lbl = tk.Label(root, text="", fg="white", bg="black",
+            # Default look for every label/frame created from here on
+            root.option_add("*Label.Background", "black")
+            root.option_add("*Label.Foreground", "white")
+            root.option_add("*Label.Font", "Helvetica 20")
+            root.option_add("*Frame.Background", "black")
+            root.option_add("*Toplevel.Background", "black")
+
+            self.title_lbl = tk.Label(root, text="",
                                       font=("Helvetica", 36, "bold"))
             self.title_lbl.pack(pady=30)
 
-            self.role_lbl = tk.Label(root, text="", fg="white", bg="black",
+            self.role_lbl = tk.Label(root, text="",
                                      font=("Helvetica", 48, "bold"),
                                      wraplength=1200, justify="center")
             self.role_lbl.pack(pady=20)
 
-            self.instr_lbl = tk.Label(root, text="", fg="white", bg="black",
-                                      font=("Helvetica", 20),
+            self.instr_lbl = tk.Label(root, text="",
                                       wraplength=1200, justify="center")
             self.instr_lbl.pack(pady=10)
 
@@ -185,8 +245,7 @@ def run_gui():
             )
             self.prev_btn.pack(pady=5)
 
-            self.bottom_lbl = tk.Label(root, text="Esc to quit",
-                                       fg="gray", bg="black",
+            self.bottom_lbl = tk.Label(root, text="Esc to quit", fg="gray",
                                        font=("Helvetica", 14))
             self.bottom_lbl.pack(side="bottom", pady=10)
 
@@ -196,39 +255,30 @@ def run_gui():
             self.location, self.spy_idx, self.roles = deal_roles(self.player_names)
             self.idx = 0
             self.seen = [False] * len(self.roles)
+            self._can_go_back = False
             self.revealed_once = False
             self.timer_running = False
             self.timer_end = None
+            self._tick_id = None
+            self._deadline_id = None
+            self._last_displayed = -1
 
         def show_player_screen(self):
-            if not self.reveal_btn.winfo_ismapped():
-                self.reveal_btn.pack(pady=30)
-            if not self.next_btn.winfo_ismapped():
-                self.next_btn.pack(pady=20)
-            if not self.prev_btn.winfo_ismapped():
-                self.prev_btn.pack(pady=5)
-            name, kind, loc, role = self.roles[self.idx]
+            name = self.roles[self.idx][0]
             self.title_lbl.config(text=f"{name}'s turn")
             self.role_lbl.config(text="(hidden)")
             self.instr_lbl.config(text="Hold the button to view your info.\nRelease to hide, then pass the device.")
             self.next_btn.config(state="disabled")
             self.revealed_once = False
-            if self.idx > 0 and self.seen[self.idx - 1]:
-                self.prev_btn.config(state="normal")
-            else:
-                self.prev_btn.config(state="disabled")
-            
+            self.prev_btn.config(state="normal" if self._can_go_back else "disabled")
+
             if self.seen[self.idx]:
                 self.instr_lbl.config(
                     text="You may re-check your role.\nHold to reveal, release to hide."
                 )
 
         def on_press_reveal(self, _event=None):
-            name, kind, loc, role = self.roles[self.idx]
-            if kind == "SPY":
-                self.role_lbl.config(text="YOU ARE THE SPY 🕵️\n\nFind the location!")
-            else:
-                self.role_lbl.config(text=f"LOCATION:\n{loc}\n\nROLE:\n{role}")
+            self.role_lbl.config(text=self.roles[self.idx][3])
             self.seen[self.idx] = True
             self.revealed_once = True
 
@@ -239,13 +289,15 @@ def run_gui():
 
         def next_player(self):
             self.idx += 1
+            self._can_go_back = self.seen[self.idx - 1]
             if self.idx >= len(self.roles):
                 self.show_post_deal_screen()
             else:
                 self.show_player_screen()
         def prev_player(self):
-            if self.idx > 0 and self.seen[self.idx - 1]:
+            if self._can_go_back:
                 self.idx -= 1
+                self._can_go_back = self.idx > 0 and self.seen[self.idx - 1]
                 self.show_player_screen()
 
         def show_post_deal_screen(self):
@@ -256,11 +308,11 @@ def run_gui():
             self.next_btn.pack_forget()
             self.prev_btn.pack_forget()
 
-            self.timer_lbl = tk.Label(self.root, text="", fg="white", bg="black",
+            self.timer_lbl = tk.Label(self.root, text="",
                                       font=("Helvetica", 48, "bold"))
             self.timer_lbl.pack(pady=20)
 
-            btn_frame = tk.Frame(self.root, bg="black")
+            btn_frame = tk.Frame(self.root)
             btn_frame.pack(pady=20)
 
             self.start_btn = tk.Button(btn_frame, text="Start Timer",
@@ -293,21 +345,24 @@ def run_gui():
             # backup close if release happens while still on the button
             self.locations_btn.bind("<ButtonRelease-1>", lambda e: self.close_locations_overlay())
 
+            self.post_deal_widgets = [self.timer_lbl, btn_frame, self.locations_btn]
+
         def start_timer(self):
             if self.timer_running:
                 return
-            self.timer_end = time.time() + self.round_minutes * 60
+            self.timer_end = time.monotonic() + self.round_minutes * 60
             self.timer_running = True
             self.start_btn.config(state="disabled")
             self.pause_btn.config(state="normal")
-            self.tick()
+            self.schedule_timer()
 
         def pause_timer(self):
             if not self.timer_running:
                 return
-            remaining = max(0, int(self.timer_end - time.time()))
+            remaining = max(0, int(self.timer_end - time.monotonic()))
             self.timer_running = False
-            self.timer_end = time.time() + remaining
+            self.cancel_timer()
+            self.timer_end = time.monotonic() + remaining
             self.start_btn.config(text="Resume", state="normal", command=self.resume_timer)
             self.pause_btn.config(state="disabled")
 
@@ -318,42 +373,64 @@ def run_gui():
             self.start_btn.config(state="disabled")
             self.pause_btn.config(state="normal")
             self.start_btn.config(text="Start Timer", command=self.start_timer)
+            self.schedule_timer()
+
+        def schedule_timer(self):
+            # One callback for the deadline, plus a tick per displayed second
+            ms_left = max(0, int((self.timer_end - time.monotonic()) * 1000))
+            self._deadline_id = self.root.after(ms_left, self.time_up)
             self.tick()
 
+        def cancel_timer(self):
+            for after_id in (self._tick_id, self._deadline_id):
+                if after_id is not None:
+                    self.root.after_cancel(after_id)
+            self._tick_id = None
+            self._deadline_id = None
+
         def tick(self):
+            self._tick_id = None
             self.update_timer_label()
             if not self.timer_running:
                 return
-            if time.time() >= self.timer_end:
-                self.timer_running = False
-                self.timer_lbl.config(text="TIME'S UP!")
-                self.start_btn.config(state="disabled")
-                self.pause_btn.config(state="disabled")
-                return
-            self.root.after(250, self.tick)
+            # Wake up just after the shown MM:SS rolls over
+            ms_to_next = int((self.timer_end - time.monotonic()) * 1000) % 1000 + 1
+            self._tick_id = self.root.after(ms_to_next, self.tick)
+
+        def time_up(self):
+            self._deadline_id = None
+            self.timer_running = False
+            self.cancel_timer()
+            self.timer_lbl.config(text="TIME'S UP!")
+            self.start_btn.config(state="disabled")
+            self.pause_btn.config(state="disabled")
 
         def update_timer_label(self, initial=False):
             if initial or not self.timer_running:
                 if self.timer_end is None:
                     remaining = self.round_minutes * 60
                 else:
-                    remaining = max(0, int(self.timer_end - time.time()))
+                    remaining = max(0, int(self.timer_end - time.monotonic()))
             else:
-                remaining = max(0, int(self.timer_end - time.time()))
+                remaining = max(0, int(self.timer_end - time.monotonic()))
 
+            if remaining == self._last_displayed:
+                return
+            self._last_displayed = remaining
             mm = remaining // 60
             ss = remaining % 60
             self.timer_lbl.config(text=f"{mm:02d}:{ss:02d}")
         def open_locations_overlay(self):
-            import tkinter as tk
-
             if self.locations_overlay is not None:
-                return  # already open
+                # Built on the first press; later presses just show it again
+                self.locations_overlay.deiconify()
+                self.locations_overlay.lift()
+                self.locations_overlay.focus_force()
+                return
 
             top = tk.Toplevel(self.root)
             self.locations_overlay = top
 
-            top.configure(bg="black")
             top.attributes("-fullscreen", True)
             top.lift()
             top.focus_force()
@@ -365,7 +442,6 @@ def run_gui():
             title = tk.Label(
                 top,
                 text="All Possible Locations (does NOT reveal the real one)",
-                fg="white", bg="black",
                 font=("Helvetica", 28, "bold")
             )
             title.pack(pady=18)
@@ -373,13 +449,13 @@ def run_gui():
             hint = tk.Label(
                 top,
                 text="Hold to view • Release to hide • Esc to close",
-                fg="gray", bg="black",
+                fg="gray",
                 font=("Helvetica", 16)
             )
             hint.pack(pady=4)
 
             # Scrollable list
-            frame = tk.Frame(top, bg="black")
+            frame = tk.Frame(top)
             frame.pack(fill="both", expand=True, padx=40, pady=20)
 
             scrollbar = tk.Scrollbar(frame)
@@ -394,20 +470,28 @@ def run_gui():
             listbox.pack(side="left", fill="both", expand=True)
             scrollbar.config(command=listbox.yview)
 
-            for loc in ALL_LOCATIONS_SORTED:
-                listbox.insert(tk.END, loc)
+            listbox.insert(tk.END, *ALL_LOCATIONS_SORTED)
 
         def close_locations_overlay(self):
             if self.locations_overlay is None:
                 return
-            try:
-                self.locations_overlay.destroy()
-            finally:
-                self.locations_overlay = None
+            self.locations_overlay.withdraw()
 
         def restart_round(self):
-            self.root.destroy()
-            main()
+            self.cancel_timer()
+            self.reset_widgets_for_new_round()
+            self.new_round()
+            self.show_player_screen()
+
+        def reset_widgets_for_new_round(self):
+            # Same players and timer length; only the post-deal widgets go
+            self.close_locations_overlay()
+            for widget in self.post_deal_widgets:
+                widget.destroy()
+            self.post_deal_widgets = []
+            self.reveal_btn.pack(pady=30)
+            self.next_btn.pack(pady=20)
+            self.prev_btn.pack(pady=5)
 
         def quit(self):
             try:
@@ -431,13 +515,12 @@ def run_cli():
     print("Spyfall (CLI fallback) - with roles\n")
 
     while True:
-        try:
-            n = int(input("Number of players (3–20): ").strip())
-            if not (3 <= n <= 20):
-                raise ValueError
-            break
-        except ValueError:
-            print("Please enter an integer between 3 and 20.")
+        s = input("Number of players (3–20): ").strip()
+        if s.isdecimal():
+            n = int(s)
+            if 3 <= n <= 20:
+                break
+        print("Please enter an integer between 3 and 20.")
 
     use_names = input("Enter player names? (y/n): ").strip().lower().startswith("y")
     if use_names:
@@ -448,9 +531,9 @@ def run_cli():
     else:
         player_names = [f"Player {i+1}" for i in range(n)]
 
-    _, _, roles = deal_roles(player_names)
+    location, _, roles = deal_roles(player_names)
 
-    for i, (name, kind, loc, role) in enumerate(roles, start=1):
+    for i, (name, kind, role, _reveal_text) in enumerate(roles, start=1):
         clear_screen()
         print(f"{name}'s turn ({i}/{n})")
         print("Pass the device to this player.")
@@ -461,7 +544,7 @@ def run_cli():
             print("YOU ARE THE SPY 🕵️")
             print("Try to figure out the location!")
         else:
-            print(f"LOCATION: {loc}")
+            print(f"LOCATION: {location}")
             print(f"ROLE:     {role}")
 
         input("\nMemorize it. Press Enter to HIDE and pass device...")
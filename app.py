@@ -4,17 +4,32 @@ Backend: Flask + Flask-SocketIO
 Players join via room code on their own devices.
 """
 
+# eventlet (optional) has to patch the stdlib before anything else imports it
+try:
+    import eventlet
+    eventlet.monkey_patch()
+    ASYNC_MODE = "eventlet"
+except ImportError:
+    ASYNC_MODE = "threading"
+
 import csv
+import functools
+import hashlib
+import json
 import secrets
 import string
 import os
 import logging
+import threading
+import time
+from time import monotonic
+from contextvars import ContextVar
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional
 
-from flask import Flask, render_template, send_from_directory
-from flask_socketio import SocketIO, emit, join_room, leave_room
+from flask import Flask, Response, render_template, request, send_from_directory
+from flask_socketio import SocketIO, join_room, leave_room
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -29,7 +44,31 @@ app = Flask(
 )
 app.config["SECRET_KEY"] = secrets.token_hex(32)
 
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
+try:
+    import orjson
+
+    class _OrjsonShim:
+        """Stdlib-compatible json facade over orjson for python-socketio/engineio."""
+
+        @staticmethod
+        def dumps(obj, **kwargs):
+            # orjson always emits compact output, so separators= etc. are redundant
+            # OPT_NON_STR_KEYS coerces keys the way stdlib json does instead of raising
+            try:
+                return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+            except orjson.JSONEncodeError:
+                # e.g. nesting deeper than orjson's limit; stdlib json still copes
+                return json.dumps(obj, **kwargs)
+
+        @staticmethod
+        def loads(s, **kwargs):
+            return orjson.loads(s)
+
+    SOCKETIO_JSON = _OrjsonShim
+except ImportError:
+    SOCKETIO_JSON = json
+
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE, json=SOCKETIO_JSON)
 
 # ---------------------------------------------------------------------------
 # Location data – loaded once from CSV
@@ -37,27 +76,29 @@ socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
 LOCATIONS_CSV = Path(__file__).parent / "locations.csv"
 
 
-def load_locations(csv_path: Path) -> dict[str, list[str]]:
+def load_locations(csv_path: Path) -> dict[str, tuple[str, ...]]:
     """Load location→roles mapping from a CSV file."""
-    location_roles: dict[str, list[str]] = {}
+    location_roles: dict[str, tuple[str, ...]] = {}
     with open(csv_path, newline="", encoding="utf-8") as fh:
-        reader = csv.DictReader(fh)
+        reader = csv.reader(fh)
+        next(reader, None)  # header: location,roles
         for row in reader:
-            location = row["location"].strip()
-            roles = [r.strip() for r in row["roles"].split(",") if r.strip()]
-            # Deduplicate roles (fixes the original Nightclub duplicate)
-            seen = set()
-            unique_roles = []
-            for r in roles:
-                if r not in seen:
-                    seen.add(r)
-                    unique_roles.append(r)
-            location_roles[location] = unique_roles
+            if len(row) < 2:
+                continue  # blank line in a hand-edited file
+            location, roles_field = row[0], row[1]
+            # Deduplicate roles in order (fixes the original Nightclub duplicate)
+            roles = (r.strip() for r in roles_field.split(","))
+            location_roles[location.strip()] = tuple(dict.fromkeys(r for r in roles if r))
     return location_roles
 
 
 LOCATION_ROLES = load_locations(LOCATIONS_CSV)
-ALL_LOCATIONS_SORTED = sorted(LOCATION_ROLES.keys())
+ALL_LOCATIONS_TUPLE = tuple(LOCATION_ROLES.keys())
+ALL_LOCATIONS_SORTED = tuple(sorted(LOCATION_ROLES.keys()))
+ALL_LOCATIONS_SET = frozenset(LOCATION_ROLES)
+# Served once via /api/locations instead of riding along in every game_state
+ALL_LOCATIONS_SORTED_JSON = json.dumps(ALL_LOCATIONS_SORTED)
+LOCATIONS_VERSION = hashlib.sha256(ALL_LOCATIONS_SORTED_JSON.encode("utf-8")).hexdigest()[:12]
 logger.info("Loaded %d locations from %s", len(LOCATION_ROLES), LOCATIONS_CSV)
 
 # ---------------------------------------------------------------------------
@@ -71,7 +112,7 @@ def _generate_room_code() -> str:
     return "".join(RNG.choices(string.ascii_uppercase + string.digits, k=6))
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     sid: str
     name: str
@@ -79,12 +120,12 @@ class Player:
     role: Optional[str] = None       # "SPY" or an actual role name
     location: Optional[str] = None   # None for spy
     notes: dict = field(default_factory=dict)        # {player_name: "note text"}
-    eliminated_locations: list = field(default_factory=list)  # spy's scratch-off list
+    eliminated_locations: set = field(default_factory=set)  # spy's scratch-off list
     vote_target: Optional[str] = None
     connected: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class GameRoom:
     code: str
     host_sid: str
@@ -104,15 +145,38 @@ class GameRoom:
     defense_timer_end: Optional[float] = None
     defense_timer_paused_remaining: Optional[int] = None
     revote_votes: dict = field(default_factory=dict)     # voter_name → target_name (revote only)
+    # Name indexes, kept in sync by add_player / remove_player
+    name_to_sid: dict = field(default_factory=dict)        # player_name → sid
+    name_lower_to_sids: dict = field(default_factory=dict)  # lowercased name → set of sids
 
     def player_names(self) -> list[str]:
         return [p.name for p in self.players.values() if p.connected]
 
     def player_by_name(self, name: str) -> Optional[Player]:
-        for p in self.players.values():
-            if p.name == name:
-                return p
-        return None
+        return self.players.get(self.name_to_sid.get(name))
+
+    def name_taken(self, name: str) -> bool:
+        """True if a connected player already uses this name (case-insensitive)."""
+        sids = self.name_lower_to_sids.get(name.lower(), ())
+        return any(self.players[sid].connected for sid in sids)
+
+    def add_player(self, player: Player):
+        self.players[player.sid] = player
+        self.name_to_sid[player.name] = player.sid
+        # A set, since case variants can coexist (e.g. via reconnect)
+        self.name_lower_to_sids.setdefault(player.name.lower(), set()).add(player.sid)
+
+    def remove_player(self, sid: str) -> Optional[Player]:
+        p = self.players.pop(sid, None)
+        if p is not None:
+            if self.name_to_sid.get(p.name) == sid:
+                self.name_to_sid.pop(p.name, None)
+            sids = self.name_lower_to_sids.get(p.name.lower())
+            if sids is not None:
+                sids.discard(sid)
+                if not sids:
+                    del self.name_lower_to_sids[p.name.lower()]
+        return p
 
     def connected_count(self) -> int:
         return sum(1 for p in self.players.values() if p.connected)
@@ -122,18 +186,19 @@ class GameRoom:
 rooms: dict[str, GameRoom] = {}
 # Reverse lookup: sid → room_code
 sid_to_room: dict[str, str] = {}
+# Held while deleting an empty room and while joining one, so a player can't
+# join a room in the middle of its deletion
+_rooms_lock = threading.Lock()
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
 def _assign_roles(location: str, non_spy_count: int) -> list[str]:
-    pool = list(LOCATION_ROLES[location])
+    pool = LOCATION_ROLES[location]
     if non_spy_count <= len(pool):
         return RNG.sample(pool, non_spy_count)
-    roles = pool[:]
-    while len(roles) < non_spy_count:
-        roles.append(RNG.choice(pool))
+    roles = [*pool, *RNG.choices(pool, k=non_spy_count - len(pool))]
     RNG.shuffle(roles)
     return roles
 
@@ -141,7 +206,7 @@ def _assign_roles(location: str, non_spy_count: int) -> list[str]:
 def _deal_round(room: GameRoom):
     """Deal a new round: pick location, pick spy, assign roles."""
     room.round_number += 1
-    room.location = RNG.choice(list(LOCATION_ROLES.keys()))
+    room.location = RNG.choice(ALL_LOCATIONS_TUPLE)
     connected = [p for p in room.players.values() if p.connected]
     spy = RNG.choice(connected)
     room.spy_sid = spy.sid
@@ -151,7 +216,7 @@ def _deal_round(room: GameRoom):
 
     for p in connected:
         p.vote_target = None
-        p.eliminated_locations = []
+        p.eliminated_locations = set()
         # Preserve notes across rounds if desired, or clear:
         # p.notes = {}
 
@@ -175,19 +240,98 @@ def _deal_round(room: GameRoom):
 
 
 _broadcast_seq = 0
+# Rooms waiting for a broadcast while a @coalesced_broadcast handler runs
+_pending_broadcasts: ContextVar[Optional[dict]] = ContextVar("pending_broadcasts", default=None)
+
+
+def coalesced_broadcast(handler):
+    """Send at most one state broadcast per room for the whole handler call."""
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        pending: dict[str, GameRoom] = {}
+        token = _pending_broadcasts.set(pending)
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            _pending_broadcasts.reset(token)
+            for room in pending.values():
+                _emit_game_state(room)
+    return wrapper
+
+
+def with_room(handler):
+    """Resolve the sender's room and player and call handler(room, player, *args).
+
+    Events from sids that are not seated in a room are dropped.
+    """
+    @functools.wraps(handler)
+    def wrapper(*args):
+        sid = request.sid
+        room = rooms.get(sid_to_room.get(sid))
+        if room is None:
+            return
+        player = room.players.get(sid)
+        if player is None:
+            return
+        return handler(room, player, *args)
+    return wrapper
+
+
+def host_only(message: Optional[str] = None):
+    """Only let the host through; others get `message` as an error, if given."""
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(room: GameRoom, player: Player, *args):
+            if player.sid != room.host_sid:
+                if message:
+                    socketio.emit("error", {"message": message}, room=player.sid)
+                return
+            return handler(room, player, *args)
+        return wrapper
+    return decorator
+
+
+def phase(*phases: str):
+    """Silently ignore the event unless the room is in one of `phases`."""
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(room: GameRoom, player: Player, *args):
+            if room.phase not in phases:
+                return
+            return handler(room, player, *args)
+        return wrapper
+    return decorator
+
 
 def _broadcast_game_state(room: GameRoom):
-    """Notify all clients in the room to fetch their personalized state."""
+    """Push every client in the room its personalized state."""
+    pending = _pending_broadcasts.get()
+    if pending is not None:
+        pending[room.code] = room
+        return
+    _emit_game_state(room)
+
+
+def _emit_game_state(room: GameRoom):
+    """Send the shared state to the whole room once, then each player's own part.
+
+    Clients merge game_state_common and game_state_private with the same seq.
+    """
     global _broadcast_seq
     _broadcast_seq += 1
-    logger.info("Broadcasting state seq=%d phase=%s to room %s", _broadcast_seq, room.phase, room.code)
+    seq = _broadcast_seq
+    logger.info("Broadcasting state seq=%d phase=%s to room %s", seq, room.phase, room.code)
 
-    # Send a lightweight trigger to all clients in the room
-    socketio.emit("state_updated", {"seq": _broadcast_seq}, room=room.code)
+    # The Socket.IO room (joined in create/join) encodes the shared payload once
+    # for all members; the private parts are fanned out from our own player map.
+    socketio.emit("game_state_common", _build_base_state(room, seq), room=room.code)
+    for p in list(room.players.values()):
+        if p.connected:
+            socketio.emit("game_state_private", _get_player_state(room, p, seq), room=p.sid)
 
 
-def _get_player_state(room: GameRoom, p, seq: int) -> dict:
-    """Build personalized state for a single player."""
+def _build_base_state(room: GameRoom, seq: int) -> dict:
+    """Build the part of the state that is identical for every player."""
     player_list = [
         {"name": pl.name, "isHost": pl.is_host, "connected": pl.connected}
         for pl in room.players.values()
@@ -201,16 +345,29 @@ def _get_player_state(room: GameRoom, p, seq: int) -> dict:
         "roundMinutes": room.round_minutes,
         "timerEnd": room.timer_end,
         "timerPausedRemaining": room.timer_paused_remaining,
-        "isHost": p.is_host,
-        "myName": p.name,
+        # Timer deadlines are on the server's monotonic clock; add this to get epoch seconds
+        "serverMonoOffset": time.time() - monotonic(),
     }
 
-    if room.phase in ("playing", "voting", "defense", "revote", "spy_guess", "round_end"):
-        state["isSpy"] = (p.sid == room.spy_sid)
-        state["allLocations"] = ALL_LOCATIONS_SORTED
-        state["eliminatedLocations"] = p.eliminated_locations
+    augment = _BASE_PHASE_AUGMENT.get(room.phase)
+    if augment is not None:
+        augment(state, room)
+
+    return state
+
 
-        if p.sid == room.spy_sid:
+def _get_player_state(room: GameRoom, p, seq: int) -> dict:
+    """Build the personalized part of the state for a single player."""
+    state = {"seq": seq}
+    state["isHost"] = p.is_host
+    state["myName"] = p.name
+
+    if room.phase in _PLAYING_PHASES:
+        is_spy = p.sid == room.spy_sid
+        state["isSpy"] = is_spy
+        state["eliminatedLocations"] = sorted(p.eliminated_locations)
+
+        if is_spy:
             state["role"] = "SPY"
             state["location"] = None
         else:
@@ -219,63 +376,87 @@ def _get_player_state(room: GameRoom, p, seq: int) -> dict:
 
         state["notes"] = p.notes
 
-    if room.phase == "voting":
-        state["votedPlayers"] = list(room.votes.keys())
-        state["myVote"] = p.vote_target
-
-    if room.phase == "defense":
-        state["tiedSuspects"] = room.tied_suspects
-        state["isSuspect"] = p.name in room.tied_suspects
-        state["defenseTimerEnd"] = room.defense_timer_end
-        state["defenseTimerPausedRemaining"] = room.defense_timer_paused_remaining
-        state["firstRoundVotes"] = room.votes
-
-    if room.phase == "revote":
-        state["tiedSuspects"] = room.tied_suspects
-        state["isSuspect"] = p.name in room.tied_suspects
-        state["canRevote"] = p.name not in room.tied_suspects
-        state["revoteVotedPlayers"] = list(room.revote_votes.keys())
-        state["myRevote"] = room.revote_votes.get(p.name)
-
-    if room.phase == "spy_guess":
-        state["spyGuessesRemaining"] = room.spy_guesses_remaining
-        if p.sid == room.spy_sid:
-            state["canGuess"] = True
-        else:
-            state["canGuess"] = False
-
-    if room.phase == "round_end":
-        spy_player = room.players.get(room.spy_sid)
-        state["spyName"] = spy_player.name if spy_player else "Unknown"
-        state["actualLocation"] = room.location
-        state["spyGuessResult"] = room.spy_guess_result
-        state["votes"] = room.votes
+        augment = _PLAYER_PHASE_AUGMENT.get(room.phase)
+        if augment is not None:
+            augment(state, room, p)
 
     return state
 
 
-@socketio.on("request_state")
-def on_request_state():
-    """Client requests its personalized state."""
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid not in room.players:
-        return
-    p = room.players[sid]
-    state = _get_player_state(room, p, _broadcast_seq)
-    emit("game_state", state)
+# Per-phase extras, looked up by room.phase instead of an if-chain per call
+def _augment_voting(state: dict, room: GameRoom):
+    state["votedPlayers"] = list(room.votes.keys())
+
+
+def _augment_defense(state: dict, room: GameRoom):
+    state["tiedSuspects"] = room.tied_suspects
+    state["defenseTimerEnd"] = room.defense_timer_end
+    state["defenseTimerPausedRemaining"] = room.defense_timer_paused_remaining
+    state["firstRoundVotes"] = room.votes
+
+
+def _augment_revote(state: dict, room: GameRoom):
+    state["tiedSuspects"] = room.tied_suspects
+    state["revoteVotedPlayers"] = list(room.revote_votes.keys())
+
+
+def _augment_spy_guess(state: dict, room: GameRoom):
+    state["spyGuessesRemaining"] = room.spy_guesses_remaining
+
+
+def _augment_round_end(state: dict, room: GameRoom):
+    spy_player = room.players.get(room.spy_sid)
+    state["spyName"] = spy_player.name if spy_player else "Unknown"
+    state["actualLocation"] = room.location
+    state["spyGuessResult"] = room.spy_guess_result
+    state["votes"] = room.votes
+
+
+def _augment_player_voting(state: dict, room: GameRoom, p: Player):
+    state["myVote"] = p.vote_target
+
+
+def _augment_player_defense(state: dict, room: GameRoom, p: Player):
+    state["isSuspect"] = p.name in room.tied_suspects
+
+
+def _augment_player_revote(state: dict, room: GameRoom, p: Player):
+    is_suspect = p.name in room.tied_suspects
+    state["isSuspect"] = is_suspect
+    state["canRevote"] = not is_suspect
+    state["myRevote"] = room.revote_votes.get(p.name)
+
+
+def _augment_player_spy_guess(state: dict, room: GameRoom, p: Player):
+    state["canGuess"] = p.sid == room.spy_sid
+
+
+_PLAYING_PHASES = frozenset({"playing", "voting", "defense", "revote", "spy_guess", "round_end"})
+
+_BASE_PHASE_AUGMENT = {
+    "voting": _augment_voting,
+    "defense": _augment_defense,
+    "revote": _augment_revote,
+    "spy_guess": _augment_spy_guess,
+    "round_end": _augment_round_end,
+}
+
+_PLAYER_PHASE_AUGMENT = {
+    "voting": _augment_player_voting,
+    "defense": _augment_player_defense,
+    "revote": _augment_player_revote,
+    "spy_guess": _augment_player_spy_guess,
+}
+
 
 
 def _check_all_voted(room: GameRoom):
     """Check if all connected players have voted."""
-    connected_names = {p.name for p in room.players.values() if p.connected}
-    voted_names = set(room.votes.keys())
-    logger.info("Vote check: connected=%s, voted=%s", connected_names, voted_names)
-    return connected_names == voted_names
+    # Cheap reject first; votes from players who have since disconnected stay
+    # in room.votes, so equal sizes alone don't prove everyone voted
+    if len(room.votes) < room.connected_count():
+        return False
+    return all(p.name in room.votes for p in room.players.values() if p.connected)
 
 
 # ---------------------------------------------------------------------------
@@ -284,53 +465,55 @@ def _check_all_voted(room: GameRoom):
 
 @socketio.on("connect")
 def on_connect():
-    logger.info("Client connected: %s", getattr(emit, 'sid', 'unknown'))
+    # Every sid is already its own Socket.IO room, so private replies use room=request.sid
+    logger.info("Client connected: %s", request.sid)
 
 
 @socketio.on("disconnect")
+@coalesced_broadcast
 def on_disconnect():
-    from flask import request
     sid = request.sid
     code = sid_to_room.pop(sid, None)
-    if code and code in rooms:
-        room = rooms[code]
-        if sid in room.players:
-            room.players[sid].connected = False
-            logger.info("Player %s disconnected from room %s",
-                        room.players[sid].name, code)
-            # If host disconnects, promote someone
-            if room.host_sid == sid:
-                for p in room.players.values():
-                    if p.connected and p.sid != sid:
-                        p.is_host = True
-                        room.host_sid = p.sid
-                        logger.info("Promoted %s to host in room %s", p.name, code)
-                        break
-            _broadcast_game_state(room)
-            # Clean up empty rooms
-            if room.connected_count() == 0:
-                del rooms[code]
-                logger.info("Room %s deleted (empty)", code)
+    room = rooms.get(code)
+    if room is None:
+        return
+    player = room.players.get(sid)
+    if player is None:
+        return
+    player.connected = False
+    logger.info("Player %s disconnected from room %s", player.name, code)
+    # If host disconnects, promote someone
+    if room.host_sid == sid:
+        for p in list(room.players.values()):
+            if p.connected and p.sid != sid:
+                p.is_host = True
+                room.host_sid = p.sid
+                logger.info("Promoted %s to host in room %s", p.name, code)
+                break
+    _broadcast_game_state(room)
+    # Clean up empty rooms
+    with _rooms_lock:
+        if room.connected_count() == 0:
+            rooms.pop(code, None)
+            logger.info("Room %s deleted (empty)", code)
 
 
 @socketio.on("create_room")
 def on_create_room(data):
-    from flask import request
     sid = request.sid
     name = (data.get("name") or "").strip()
     if not name:
-        emit("error", {"message": "Please enter your name."})
+        socketio.emit("error", {"message": "Please enter your name."}, room=request.sid)
         return
 
-    code = _generate_room_code()
-    while code in rooms:
-        code = _generate_room_code()
-
     player = Player(sid=sid, name=name, is_host=True)
-    room = GameRoom(code=code, host_sid=sid)
-    room.players[sid] = player
+    room = GameRoom(code=_generate_room_code(), host_sid=sid)
+    room.add_player(player)
 
-    rooms[code] = room
+    # setdefault claims the code atomically; retry on the rare collision
+    while rooms.setdefault(room.code, room) is not room:
+        room.code = _generate_room_code()
+    code = room.code
     sid_to_room[sid] = code
     join_room(code)
 
@@ -340,30 +523,32 @@ def on_create_room(data):
 
 @socketio.on("join_room")
 def on_join_room(data):
-    from flask import request
     sid = request.sid
     name = (data.get("name") or "").strip()
     code = (data.get("code") or "").strip().upper()
 
     if not name:
-        emit("error", {"message": "Please enter your name."})
+        socketio.emit("error", {"message": "Please enter your name."}, room=request.sid)
         return
-    if code not in rooms:
-        emit("error", {"message": f"Room '{code}' not found."})
+    room = rooms.get(code)
+    if room is None:
+        socketio.emit("error", {"message": f"Room '{code}' not found."}, room=request.sid)
         return
 
-    room = rooms[code]
-
     if room.phase != "lobby":
         # Allow reconnect if name matches a disconnected player
         existing = room.player_by_name(name)
         if existing and not existing.connected:
             # Reconnect
             old_sid = existing.sid
-            del room.players[old_sid]
-            existing.sid = sid
-            existing.connected = True
-            room.players[sid] = existing
+            with _rooms_lock:
+                if rooms.get(code) is not room:
+                    socketio.emit("error", {"message": f"Room '{code}' not found."}, room=request.sid)
+                    return
+                room.remove_player(old_sid)
+                existing.sid = sid
+                existing.connected = True
+                room.add_player(existing)
             sid_to_room[sid] = code
             join_room(code)
             if old_sid == room.host_sid:
@@ -372,17 +557,20 @@ def on_join_room(data):
             _broadcast_game_state(room)
             return
         else:
-            emit("error", {"message": "Game already in progress. Cannot join."})
+            socketio.emit("error", {"message": "Game already in progress. Cannot join."}, room=request.sid)
             return
 
     # Check duplicate names
-    for p in room.players.values():
-        if p.name.lower() == name.lower() and p.connected:
-            emit("error", {"message": f"Name '{name}' is already taken."})
-            return
+    if room.name_taken(name):
+        socketio.emit("error", {"message": f"Name '{name}' is already taken."}, room=request.sid)
+        return
 
     player = Player(sid=sid, name=name)
-    room.players[sid] = player
+    with _rooms_lock:
+        if rooms.get(code) is not room:
+            socketio.emit("error", {"message": f"Room '{code}' not found."}, room=request.sid)
+            return
+        room.add_player(player)
     sid_to_room[sid] = code
     join_room(code)
 
@@ -391,21 +579,12 @@ def on_join_room(data):
 
 
 @socketio.on("start_game")
-def on_start_game(data):
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-
-    room = rooms[code]
-    if sid != room.host_sid:
-        emit("error", {"message": "Only the host can start the game."})
-        return
-
+@with_room
+@host_only("Only the host can start the game.")
+def on_start_game(room: GameRoom, player: Player, data):
     connected = room.connected_count()
     if connected < 3:
-        emit("error", {"message": "Need at least 3 players to start."})
+        socketio.emit("error", {"message": "Need at least 3 players to start."}, room=player.sid)
         return
 
     minutes = data.get("minutes")
@@ -414,104 +593,64 @@ def on_start_game(data):
 
     _deal_round(room)
     logger.info("Round %d started in room %s (location: %s)",
-                room.round_number, code, room.location)
+                room.round_number, room.code, room.location)
     _broadcast_game_state(room)
 
 
 @socketio.on("start_timer")
-def on_start_timer():
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid != room.host_sid:
-        return
-
-    import time
+@with_room
+@host_only()
+def on_start_timer(room: GameRoom, player: Player):
     if room.timer_paused_remaining is not None:
-        room.timer_end = time.time() + room.timer_paused_remaining
+        room.timer_end = monotonic() + room.timer_paused_remaining
         room.timer_paused_remaining = None
     else:
-        room.timer_end = time.time() + room.round_minutes * 60
+        room.timer_end = monotonic() + room.round_minutes * 60
 
     _broadcast_game_state(room)
 
 
 @socketio.on("pause_timer")
-def on_pause_timer():
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid != room.host_sid:
-        return
-
-    import time
+@with_room
+@host_only()
+def on_pause_timer(room: GameRoom, player: Player):
     if room.timer_end:
-        remaining = max(0, int(room.timer_end - time.time()))
+        remaining = max(0, int(room.timer_end - monotonic()))
         room.timer_paused_remaining = remaining
         room.timer_end = None
     _broadcast_game_state(room)
 
 
 @socketio.on("update_notes")
-def on_update_notes(data):
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid not in room.players:
-        return
-
+@with_room
+def on_update_notes(room: GameRoom, player: Player, data):
     target_name = data.get("targetName", "")
     note_text = data.get("noteText", "")
-    room.players[sid].notes[target_name] = note_text
+    player.notes[str(target_name)] = str(note_text)
 
 
 @socketio.on("toggle_location")
-def on_toggle_location(data):
+@with_room
+def on_toggle_location(room: GameRoom, player: Player, data):
     """Spy toggles a location as eliminated/not eliminated."""
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid not in room.players:
-        return
-
     loc = data.get("location", "")
-    player = room.players[sid]
+    if loc not in ALL_LOCATIONS_SET:
+        return
     if loc in player.eliminated_locations:
-        player.eliminated_locations.remove(loc)
+        player.eliminated_locations.discard(loc)
     else:
-        player.eliminated_locations.append(loc)
+        player.eliminated_locations.add(loc)
 
     # Only send back to this player (lightweight)
-    emit("location_toggled", {"eliminatedLocations": player.eliminated_locations})
+    socketio.emit("location_toggled", {"eliminatedLocations": sorted(player.eliminated_locations)}, room=player.sid)
 
 
 @socketio.on("call_vote")
-def on_call_vote():
+@with_room
+@host_only("Only the host can call a vote.")
+@phase("playing")
+def on_call_vote(room: GameRoom, player: Player):
     """Host initiates a vote."""
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid != room.host_sid:
-        emit("error", {"message": "Only the host can call a vote."})
-        return
-    if room.phase != "playing":
-        return
-
     room.phase = "voting"
     room.votes = {}
     for p in room.players.values():
@@ -520,23 +659,14 @@ def on_call_vote():
 
 
 @socketio.on("cast_vote")
-def on_cast_vote(data):
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if room.phase != "voting":
-        return
-    if sid not in room.players:
-        return
-
+@coalesced_broadcast
+@with_room
+@phase("voting")
+def on_cast_vote(room: GameRoom, voter: Player, data):
     target = data.get("target", "")
-    voter = room.players[sid]
     voter.vote_target = target
     room.votes[voter.name] = target
-    logger.info("Vote cast: %s -> %s (room %s, phase %s)", voter.name, target, code, room.phase)
+    logger.info("Vote cast: %s -> %s (room %s, phase %s)", voter.name, target, room.code, room.phase)
 
     # If everyone has voted, resolve immediately (do NOT broadcast voting state first,
     # as that causes a race where the client receives voting-state after defense-state)
@@ -547,19 +677,11 @@ def on_cast_vote(data):
 
 
 @socketio.on("cancel_vote")
-def on_cancel_vote():
+@with_room
+@host_only()
+@phase("voting")
+def on_cancel_vote(room: GameRoom, player: Player):
     """Host cancels the vote and returns to playing."""
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid != room.host_sid:
-        return
-    if room.phase != "voting":
-        return
-
     room.phase = "playing"
     room.votes = {}
     for p in room.players.values():
@@ -568,86 +690,55 @@ def on_cancel_vote():
 
 
 @socketio.on("start_defense_timer")
-def on_start_defense_timer():
-    from flask import request
-    import time
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid != room.host_sid or room.phase != "defense":
-        return
-
+@with_room
+@host_only()
+@phase("defense")
+def on_start_defense_timer(room: GameRoom, player: Player):
     if room.defense_timer_paused_remaining is not None:
-        room.defense_timer_end = time.time() + room.defense_timer_paused_remaining
+        room.defense_timer_end = monotonic() + room.defense_timer_paused_remaining
         room.defense_timer_paused_remaining = None
     else:
-        room.defense_timer_end = time.time() + 30 * len(room.tied_suspects)
+        room.defense_timer_end = monotonic() + 30 * len(room.tied_suspects)
     _broadcast_game_state(room)
 
 
 @socketio.on("pause_defense_timer")
-def on_pause_defense_timer():
-    from flask import request
-    import time
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid != room.host_sid or room.phase != "defense":
-        return
-
+@with_room
+@host_only()
+@phase("defense")
+def on_pause_defense_timer(room: GameRoom, player: Player):
     if room.defense_timer_end:
-        remaining = max(0, int(room.defense_timer_end - time.time()))
+        remaining = max(0, int(room.defense_timer_end - monotonic()))
         room.defense_timer_paused_remaining = remaining
         room.defense_timer_end = None
     _broadcast_game_state(room)
 
 
 @socketio.on("proceed_to_revote")
-def on_proceed_to_revote():
+@with_room
+@host_only()
+@phase("defense")
+def on_proceed_to_revote(room: GameRoom, player: Player):
     """Host moves from defense phase to revote phase."""
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid != room.host_sid:
-        return
-    if room.phase != "defense":
-        return
-
     room.phase = "revote"
     room.revote_votes = {}
     _broadcast_game_state(room)
 
 
 @socketio.on("cast_revote")
-def on_cast_revote(data):
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if room.phase != "revote":
-        return
-    if sid not in room.players:
-        return
-
-    voter = room.players[sid]
+@coalesced_broadcast
+@with_room
+@phase("revote")
+def on_cast_revote(room: GameRoom, voter: Player, data):
     # Suspects cannot vote in revote
     if voter.name in room.tied_suspects:
-        emit("error", {"message": "Suspects cannot vote in the revote."})
+        socketio.emit("error", {"message": "Suspects cannot vote in the revote."}, room=voter.sid)
         return
 
     target = data.get("target", "")
     # Can only vote for suspects
     if target not in room.tied_suspects:
-        emit("error", {"message": "You can only vote for the suspects."})
+        socketio.emit("error", {"message": "You can only vote for the suspects."}, room=voter.sid)
         return
 
     room.revote_votes[voter.name] = target
@@ -661,19 +752,27 @@ def on_cast_revote(data):
         _broadcast_game_state(room)
 
 
+def _tally(votes: dict[str, str]) -> tuple[dict[str, int], list[str]]:
+    """Count votes per name and return (counts, names with the most votes)."""
+    counts: dict[str, int] = {}
+    top_count = 0
+    for name in votes.values():
+        count = counts[name] = counts.get(name, 0) + 1
+        if count > top_count:
+            top_count = count
+    tied = [name for name, count in counts.items() if count == top_count]
+    return counts, tied
+
+
 def _resolve_vote(room: GameRoom):
     """Tally votes and determine outcome."""
-    from collections import Counter
-    tally = Counter(room.votes.values())
-    logger.info("Resolving vote in room %s: tally=%s", room.code, dict(tally))
+    tally, tied = _tally(room.votes)
+    logger.info("Resolving vote in room %s: tally=%s", room.code, tally)
     if not tally:
         room.phase = "playing"
         _broadcast_game_state(room)
         return
 
-    top_count = tally.most_common(1)[0][1]
-    tied = [name for name, count in tally.items() if count == top_count]
-
     if len(tied) > 1:
         # Check how many non-suspect voters would be available for a revote
         connected_names = {p.name for p in room.players.values() if p.connected}
@@ -708,16 +807,12 @@ def _resolve_vote(room: GameRoom):
 
 def _resolve_revote(room: GameRoom):
     """Tally revote and determine outcome. Tie on revote = spy wins."""
-    from collections import Counter
-    tally = Counter(room.revote_votes.values())
+    tally, tied = _tally(room.revote_votes)
     if not tally:
         room.phase = "playing"
         _broadcast_game_state(room)
         return
 
-    top_count = tally.most_common(1)[0][1]
-    tied = [name for name, count in tally.items() if count == top_count]
-
     if len(tied) > 1:
         # Tie on revote → spy wins
         room.phase = "round_end"
@@ -746,17 +841,12 @@ def _check_accusation(room: GameRoom, accused_name: str):
 
 
 @socketio.on("spy_guess")
-def on_spy_guess(data):
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if room.phase != "spy_guess":
-        return
-    if sid != room.spy_sid:
-        emit("error", {"message": "Only the spy can guess."})
+@coalesced_broadcast
+@with_room
+@phase("spy_guess")
+def on_spy_guess(room: GameRoom, player: Player, data):
+    if player.sid != room.spy_sid:
+        socketio.emit("error", {"message": "Only the spy can guess."}, room=player.sid)
         return
 
     guess = data.get("location", "")
@@ -772,73 +862,52 @@ def on_spy_guess(data):
         _broadcast_game_state(room)
     else:
         # Wrong guess, but still has attempts
-        emit("guess_result", {
+        socketio.emit("guess_result", {
             "correct": False,
             "remaining": room.spy_guesses_remaining,
             "message": f"'{guess}' is wrong! You have {room.spy_guesses_remaining} guess(es) left."
-        })
-        _broadcast_game_state(room)
+        }, room=player.sid)
+        # Only the counter changed — no need for a full state fan-out
+        socketio.emit("spy_guesses_updated", {"remaining": room.spy_guesses_remaining}, room=room.code)
 
 
 @socketio.on("new_round")
-def on_new_round():
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid != room.host_sid:
-        emit("error", {"message": "Only the host can start a new round."})
-        return
-
+@with_room
+@host_only("Only the host can start a new round.")
+def on_new_round(room: GameRoom, player: Player):
     _deal_round(room)
-    logger.info("Round %d started in room %s", room.round_number, code)
+    logger.info("Round %d started in room %s", room.round_number, room.code)
     _broadcast_game_state(room)
 
 
 @socketio.on("return_to_lobby")
-def on_return_to_lobby():
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid != room.host_sid:
-        return
-
+@with_room
+@host_only()
+def on_return_to_lobby(room: GameRoom, player: Player):
     room.phase = "lobby"
     room.round_number = 0
     for p in room.players.values():
         p.role = None
         p.location = None
         p.notes = {}
-        p.eliminated_locations = []
+        p.eliminated_locations = set()
         p.vote_target = None
     _broadcast_game_state(room)
 
 
 @socketio.on("kick_player")
-def on_kick_player(data):
+@coalesced_broadcast
+@with_room
+@host_only("Only the host can kick players.")
+def on_kick_player(room: GameRoom, player: Player, data):
     """Host kicks a player from the room."""
-    from flask import request
-    sid = request.sid
-    code = sid_to_room.get(sid)
-    if not code or code not in rooms:
-        return
-    room = rooms[code]
-    if sid != room.host_sid:
-        emit("error", {"message": "Only the host can kick players."})
-        return
-
     target_name = data.get("name", "")
     target = room.player_by_name(target_name)
     if not target:
         return
     # Host cannot kick themselves
     if target.sid == room.host_sid:
-        emit("error", {"message": "You can't kick yourself."})
+        socketio.emit("error", {"message": "You can't kick yourself."}, room=player.sid)
         return
 
     # Notify kicked player before removing
@@ -849,10 +918,10 @@ def on_kick_player(data):
     # Clean up
     target_sid = target.sid
     sid_to_room.pop(target_sid, None)
-    del room.players[target_sid]
-    leave_room(code, sid=target_sid)
+    room.remove_player(target_sid)
+    leave_room(room.code, sid=target_sid)
 
-    logger.info("Player %s kicked from room %s by host", target_name, code)
+    logger.info("Player %s kicked from room %s by host", target_name, room.code)
 
     # If we kicked the spy mid-game, end the round
     if room.phase in ("playing", "voting", "spy_guess") and target_sid == room.spy_sid:
@@ -868,7 +937,17 @@ def on_kick_player(data):
 
 @app.route("/")
 def index():
-    return render_template("index.html")
+    return render_template("index.html", locations_version=LOCATIONS_VERSION)
+
+
+@app.route("/api/locations")
+def api_locations():
+    """Location list; the page requests it with ?v=LOCATIONS_VERSION, so it never goes stale."""
+    return Response(
+        ALL_LOCATIONS_SORTED_JSON,
+        mimetype="application/json",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
 
 
 @app.route("/health")
@@ -882,5 +961,5 @@ def health():
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
-    logger.info("Starting Spyfall on port %d", port)
+    logger.info("Starting Spyfall on port %d (async mode: %s)", port, ASYNC_MODE)
     socketio.run(app, host="0.0.0.0", port=port, debug=False, allow_unsafe_werkzeug=True)